@@ -1,5 +1,9 @@
 
 if __name__ == "__main__":
+    import os
+    #let numba target the host CPU (AVX2/AVX-512) when compiling kernels
+    os.environ.setdefault("NUMBA_CPU_NAME", "native")
+
     from src.config import Config
     from src.logger import Logger
     from src.pipeline import Pipeline
@@ -0,0 +1,30 @@
+from functools import lru_cache
+import numpy as np
+import geopandas as gpd
+import shapely
+from pyproj import CRS, Transformer
+
+
+@lru_cache(maxsize=16)
+def cached_transformer(src_crs_wkt: str, dst_crs_wkt: str, always_xy: bool = True) -> Transformer:
+    """Build a pyproj Transformer once per (source, target) CRS pair"""
+    return Transformer.from_crs(
+        CRS.from_wkt(src_crs_wkt),
+        CRS.from_wkt(dst_crs_wkt),
+        always_xy=always_xy
+    )
+
+
+def to_crs_cached(gdf: gpd.GeoDataFrame, crs) -> gpd.GeoDataFrame:
+    """Equivalent of gdf.to_crs(crs) that reuses a cached Transformer"""
+    target = CRS.from_user_input(crs)
+    if gdf.crs == target:
+        return gdf.copy()
+    
+    transformer = cached_transformer(gdf.crs.to_wkt(), target.to_wkt())
+    geoms = shapely.transform(
+        gdf.geometry.values,
+        lambda xy: np.column_stack(transformer.transform(xy[:, 0], xy[:, 1]))
+    )
+    geometry = gpd.GeoSeries(geoms, index=gdf.index, crs=target, name=gdf.geometry.name)
+    return gdf.set_geometry(geometry)
@@ -0,0 +1,39 @@
+import math
+import numpy as np
+from numba import njit, prange
+
+#fused nearest-facility search + threshold classification, writing into
+#caller-allocated outputs; eager signature + cache=True avoids cold JIT
+@njit(
+    'void(f4[:,::1], f4[:,::1], f4[::1], i8[::1], f4[::1], b1[:,::1])',
+    parallel=True,
+    fastmath=True,
+    cache=True,
+    boundscheck=False,
+    error_model='numpy'
+)
+def nearest_with_thresholds(pop_xy, fac_xy, thresholds_km, nearest_idx, dist_m, within):
+    n_pop = pop_xy.shape[0]
+    n_fac = fac_xy.shape[0]
+    n_thr = thresholds_km.shape[0]
+
+    for i in prange(n_pop):
+        px = pop_xy[i, 0]
+        py = pop_xy[i, 1]
+        #finite sentinel: fastmath assumes no infinities
+        best_d2 = np.float32(3.4e38)
+        best_j = -1
+        for j in range(n_fac):
+            dx = fac_xy[j, 0] - px
+            dy = fac_xy[j, 1] - py
+            d2 = dx * dx + dy * dy
+            if d2 < best_d2:
+                best_d2 = d2
+                best_j = j
+
+        d = np.float32(math.sqrt(best_d2))
+        nearest_idx[i] = best_j
+        dist_m[i] = d
+        d_km = d / np.float32(1000.0)
+        for k in range(n_thr):
+            within[i, k] = d_km <= thresholds_km[k]
@@ -1,9 +1,53 @@
-from typing import List, Optional, cast
-import numpy as np
-from shapely.geometry import Point
-import geopandas as gpd
+from __future__ import annotations
+
+import importlib.util
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
 from src.analysis.base import BaseAnalyzer
 
+if TYPE_CHECKING:
+    import numpy as np
+    import geopandas as gpd
+
+#below this many facilities the brute-force kernel beats a KD-tree
+FUSED_KERNEL_MAX_FACILITIES = 500
+
+#largest P x F float64 distance block computed in one BLAS call (~32 MB)
+GRAM_MAX_PAIRS = 4_000_000
+
+
+def _numba_available() -> bool:
+    return importlib.util.find_spec('numba') is not None
+
+
+def projected_xy(gdf: gpd.GeoDataFrame) -> np.ndarray:
+    #(N, 2) float64 coordinates, extracted from the geometry array every
+    #call: one vectorized pass, and never stale after row/CRS changes
+    import numpy as np
+    
+    return np.column_stack([gdf.geometry.x.to_numpy(), gdf.geometry.y.to_numpy()])
+
+
+def _as_xy_f32(gdf: gpd.GeoDataFrame, origin: Tuple[float, float] = (0.0, 0.0)) -> np.ndarray:
+    #contiguous (N, 2) float32 coordinates, shifted to a local origin
+    #so projected (UTM) values keep sub-metre precision
+    import numpy as np
+    
+    return np.ascontiguousarray(projected_xy(gdf) - np.asarray(origin), dtype=np.float32)
+
+
+def _nearest_gram(pop_xy: np.ndarray, fac_xy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    #full distance block via |p|^2 + |f|^2 - 2 P F^T (a single gemm call)
+    #centred and kept in float64: UTM magnitudes cancel badly in float32
+    import numpy as np
+    
+    origin = fac_xy.mean(axis=0)
+    p = pop_xy - origin
+    f = fac_xy - origin
+    d2 = (p * p).sum(1)[:, None] + (f * f).sum(1)[None, :] - 2.0 * (p @ f.T)
+    idxs = d2.argmin(axis=1)
+    best = np.take_along_axis(d2, idxs[:, None], axis=1).ravel()
+    return np.sqrt(np.maximum(best, 0.0)), idxs
+
 class AccessibilityAnalyzer(BaseAnalyzer):
     def calculate_distances(
         self,
@@ -11,40 +55,56 @@ class AccessibilityAnalyzer(BaseAnalyzer):
         population: gpd.GeoDataFrame
     ) -> gpd.GeoDataFrame:
         #finding distance from population to nearest facility
+        from scipy.spatial import cKDTree
+        
         self.logger.info("Calculating distances to nearest facilities...")
         
-        population['nearest_facility_idx'] = population.geometry.apply(
-            lambda geom: facilities.distance(geom).argmin()
-        )
-        population['distance_to_facility_m'] = population.geometry.apply(
-            lambda geom: facilities.distance(geom).min()
-        )
-        population['distance_to_facility_km'] = (
-            population['distance_to_facility_m'] / 1000
-        )
+        fac_xy = projected_xy(facilities)
+        pop_xy = projected_xy(population)
+        
+        if len(fac_xy) * len(pop_xy) <= GRAM_MAX_PAIRS:
+            dists, idxs = _nearest_gram(pop_xy, fac_xy)
+        else:
+            #single nearest-neighbour query instead of a full scan per point
+            tree = cKDTree(fac_xy)
+            dists, idxs = tree.query(pop_xy, k=1, workers=-1)
+        
+        population['nearest_facility_idx'] = idxs
+        population['distance_to_facility_m'] = dists
+        population['distance_to_facility_km'] = dists / 1000.0
         self.logger.info("Distance calculation complete")
         return population
     
     def classify_accessibility(
         self,
         population: gpd.GeoDataFrame,
-        thresholds_km: Optional[List[float]] = None
+        thresholds_km: Optional[Sequence[float]] = None
     ) -> gpd.GeoDataFrame:
         #classifying accessibility by threshold
+        import numpy as np
+        import pandas as pd
+        
         if thresholds_km is None:
-            thresholds_km = cast(
-                List[float],
-                self.config['accessibility']['catchment_thresholds']
-            )
+            thresholds_km = self.config.thresholds_km
+        else:
+            thresholds_km = sorted(thresholds_km)
         
         self.logger.info(f"Classifying accessibility with thresholds: {thresholds_km}")
         
-        distance = population['distance_to_facility_km']
+        thr = np.asarray(thresholds_km, dtype=np.float64)
+        distance = population['distance_to_facility_km'].to_numpy(dtype=np.float64, copy=False)
         
-        for threshold in sorted(thresholds_km):
-            col_name = f'within_{threshold}km'
-            population[col_name] = distance <= threshold
+        #thresholds are sorted, so within_t is monotone in t: one searchsorted
+        #gives each point its first satisfied threshold k0, and column k is k >= k0
+        k0 = np.searchsorted(thr, distance, side='left')
+        mask = np.arange(len(thr))[None, :] >= k0[:, None]
+        col_names = [f'within_{threshold}km' for threshold in thresholds_km]
+        new_cols = pd.DataFrame(mask, columns=col_names, index=population.index)
         
+        population = pd.concat(
+            [population.drop(columns=col_names, errors='ignore'), new_cols],
+            axis=1
+        )
         return population
     
     def create_population_grid(
@@ -53,23 +113,77 @@ class AccessibilityAnalyzer(BaseAnalyzer):
         grid_size: int = 20
     ) -> gpd.GeoDataFrame:
         #creating grid of population centers
+        import numpy as np
+        import geopandas as gpd
+        
         self.logger.info(f"Creating population grid ({grid_size}x{grid_size})...")
         
         minx, miny, maxx, maxy = boundaries.total_bounds
-        points = [
-            Point(x, y)
-            for x in np.linspace(minx, maxx, grid_size)
-            for y in np.linspace(miny, maxy, grid_size)
-        ]
-        grid = gpd.GeoDataFrame(
-            {'geometry': points},
-            crs=boundaries.crs
-        )
+        xs_1d = np.linspace(minx, maxx, grid_size)
+        ys_1d = np.linspace(miny, maxy, grid_size)
+        #'ij' indexing keeps the x-major point order of the original grid
+        xx, yy = np.meshgrid(xs_1d, ys_1d, indexing='ij')
+        geom = gpd.points_from_xy(xx.ravel(), yy.ravel())
+        grid = gpd.GeoDataFrame(geometry=geom, crs=boundaries.crs)
+        
+        #dropping bbox points that fall outside the boundary polygons
+        before = len(grid)
+        grid = gpd.sjoin(grid, boundaries[['geometry']], predicate='within', how='inner')
+        grid = grid[~grid.index.duplicated()].drop(columns='index_right').reset_index(drop=True)
+        self.logger.info(f"Clipped grid to boundaries: {before} -> {len(grid)} points")
+        
         self.logger.info(f"Created {len(grid)} grid points")
         return grid
     
+    def calculate_fused(
+        self,
+        facilities: gpd.GeoDataFrame,
+        population: gpd.GeoDataFrame,
+        thresholds_km: Optional[Sequence[float]] = None
+    ) -> gpd.GeoDataFrame:
+        #nearest facility + threshold flags in a single Numba pass
+        import numpy as np
+        import pandas as pd
+        
+        if thresholds_km is None:
+            thresholds_km = self.config.thresholds_km
+        else:
+            thresholds_km = sorted(thresholds_km)
+        self.logger.info(
+            f"Calculating distances and classifying with thresholds: {thresholds_km}"
+        )
+        
+        minx, miny, _, _ = facilities.total_bounds
+        fac_xy = _as_xy_f32(facilities, (minx, miny))
+        pop_xy = _as_xy_f32(population, (minx, miny))
+        thr = np.asarray(thresholds_km, dtype=np.float32)
+        
+        #imported here so numba's start-up cost is only paid when used
+        from src.analysis._kernels import nearest_with_thresholds
+        
+        idxs = np.empty(len(pop_xy), dtype=np.int64)
+        dists = np.empty(len(pop_xy), dtype=np.float32)
+        mask = np.empty((len(pop_xy), len(thr)), dtype=np.bool_)
+        nearest_with_thresholds(pop_xy, fac_xy, thr, idxs, dists, mask)
+        
+        population['nearest_facility_idx'] = idxs
+        population['distance_to_facility_m'] = dists.astype(np.float64)
+        population['distance_to_facility_km'] = population['distance_to_facility_m'] / 1000.0
+        
+        col_names = [f'within_{threshold}km' for threshold in thresholds_km]
+        new_cols = pd.DataFrame(mask, columns=col_names, index=population.index)
+        population = pd.concat(
+            [population.drop(columns=col_names, errors='ignore'), new_cols],
+            axis=1
+        )
+        self.logger.info("Distance calculation complete")
+        return population
+    
     def analyze(self, facilities: gpd.GeoDataFrame, population: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         #complete accessibility analysis
+        if 0 < len(facilities) <= FUSED_KERNEL_MAX_FACILITIES and _numba_available():
+            return self.calculate_fused(facilities, population)
+        
         pop_with_distances = self.calculate_distances(facilities, population)
         pop_classified = self.classify_accessibility(pop_with_distances)
         return pop_classified
@@ -1,33 +1,60 @@
+from __future__ import annotations
+
 import json
-from typing import Dict
-import geopandas as gpd
+import math
+from typing import TYPE_CHECKING, Any, Dict
 from src.analysis.base import BaseAnalyzer
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+def _nan_to_none(value: Any) -> Any:
+    #NaN is not valid JSON; write null whichever serializer is installed
+    if isinstance(value, dict):
+        return {k: _nan_to_none(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_nan_to_none(v) for v in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
 class StatisticsAnalyzer(BaseAnalyzer):
     def calculate_stats(
         self,
         facilities: gpd.GeoDataFrame,
         accessibility: gpd.GeoDataFrame
     ) -> Dict:
+        import numpy as np
+
         self.logger.info("Calculating summary statistics...")
 
-        thresholds = self.config['accessibility']['catchment_thresholds']
+        thresholds = self.config.thresholds_km
+
+        d = accessibility['distance_to_facility_km'].to_numpy(dtype=np.float64)
+        #skip NaN like the pandas reductions did; no points gives NaN throughout
+        d = d[~np.isnan(d)]
+        if d.size:
+            min_km, median_km, max_km = np.percentile(d, [0, 50, 100])
+            mean_km = d.mean()
+        else:
+            min_km = median_km = max_km = mean_km = np.nan
+        std_km = d.std(ddof=1) if d.size > 1 else np.nan
 
         stats = {
             'total_facilities': int(len(facilities)),
             'distance_statistics': {
-                'mean_km': float(accessibility['distance_to_facility_km'].mean()),
-                'median_km': float(accessibility['distance_to_facility_km'].median()),
-                'std_km': float(accessibility['distance_to_facility_km'].std()),
-                'min_km': float(accessibility['distance_to_facility_km'].min()),
-                'max_km': float(accessibility['distance_to_facility_km'].max()),
+                'mean_km': float(mean_km),
+                'median_km': float(median_km),
+                'std_km': float(std_km),
+                'min_km': float(min_km),
+                'max_km': float(max_km),
             },
             'accessibility_by_threshold': {}
         }
         
-        for threshold in thresholds:
-            col_name = f'within_{threshold}km'
-            count = accessibility[col_name].sum()
+        col_names = [f'within_{threshold}km' for threshold in thresholds]
+        counts = accessibility[col_names].to_numpy().sum(axis=0)
+        for threshold, count in zip(thresholds, counts):
             percentage = (count / len(accessibility)) * 100
             stats['accessibility_by_threshold'][f'{threshold}km'] = {
                 'count': int(count),
@@ -40,8 +67,16 @@ class StatisticsAnalyzer(BaseAnalyzer):
     def save_stats(self, stats: Dict, output_path: str) -> None:
         #saving statistics to JSON
         self.logger.info(f"Saving statistics to {output_path}...")
-        with open(output_path, 'w') as f:
-            json.dump(stats, f, indent=2)
+        stats = _nan_to_none(stats)
+        try:
+            import orjson
+        except ImportError:
+            with open(output_path, 'w') as f:
+                json.dump(stats, f, indent=2, allow_nan=False)
+            return
+        
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     def analyze(self, facilities: gpd.GeoDataFrame, accessibility: gpd.GeoDataFrame) -> Dict:
         #returns complete statistics analysis
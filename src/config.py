@@ -1,5 +1,6 @@
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 import json
 import yaml
 
@@ -17,13 +18,29 @@ class Config:
         
         with open(self.config_path) as f:
             if self.config_path.suffix == '.yaml':
-                return yaml.safe_load(f) or {}
+                config = yaml.safe_load(f) or {}
             else:
-                return json.load(f)
+                config = json.load(f)
+        return self._normalize_thresholds(config)
+    
+    @staticmethod
+    def _normalize_thresholds(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and pre-sort distance thresholds once at load time"""
+        for section, key in (
+            ('accessibility', 'catchment_thresholds'),
+            ('analysis', 'accessibility_threshold_km'),
+        ):
+            values = (config.get(section) or {}).get(key)
+            if values is None:
+                continue
+            if not all(isinstance(v, (int, float)) for v in values):
+                raise ValueError(f"{section}.{key} must be a list of numbers, got {values}")
+            config[section][key] = tuple(sorted(values))
+        return config
     
     def _default_config(self) -> Dict[str, Any]:
         """Default configuration"""
-        return {
+        return self._normalize_thresholds({
             'country': 'Kenya',
             'country_code': 'KEN',
             'iso_code_3166': 'KE',
@@ -51,7 +68,15 @@ class Config:
                 'generate_accessibility_map': True,
                 'generate_statistics': True,
             }
-        }
+        })
+    
+    @cached_property
+    def thresholds_km(self) -> Tuple[float, ...]:
+        """Sorted accessibility distance thresholds"""
+        thresholds = self.config.get('accessibility', {}).get('catchment_thresholds')
+        if thresholds is None:
+            thresholds = self.config.get('analysis', {}).get('accessibility_threshold_km', ())
+        return tuple(thresholds)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value"""
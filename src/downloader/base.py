@@ -1,14 +1,47 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+import threading
+from typing import TYPE_CHECKING
 from src.logger import Logger
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import requests
+
 class BaseDownloader(ABC):
     """Abstract base class for all downloaders"""
+    
+    _session = None
+    _session_lock = threading.Lock()
+    
     def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.logger = Logger.get(self.__class__.__name__)
     
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session shared by every downloader (keep-alive + retries)"""
+        if BaseDownloader._session is None:
+            with BaseDownloader._session_lock:
+                if BaseDownloader._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from urllib3.util.retry import Retry
+                    
+                    retry = Retry(
+                        total=3,
+                        backoff_factor=0.5,
+                        status_forcelist=[429, 500, 502, 503, 504]
+                    )
+                    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+                    session = requests.Session()
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    BaseDownloader._session = session
+        return BaseDownloader._session
+    
     @abstractmethod
     def download(self) -> str:
         #downloads data and returns path
@@ -1,20 +1,32 @@
-import pandas as pd
-import geopandas as gpd
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional
 from src.downloader.base import BaseDownloader
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+
 class CSVDataLoader(BaseDownloader):
     """Load specialist or facility data from CSV files"""
     def __init__(self, output_dir: str, csv_path: str, lat_col: str = 'latitude', 
-                 lon_col: str = 'longitude'):
+                 lon_col: str = 'longitude', save_to_disk: bool = True,
+                 columns: Optional[List[str]] = None):
         super().__init__(output_dir)
         self.csv_path = csv_path
         self.lat_col = lat_col
         self.lon_col = lon_col
+        self.save_to_disk = save_to_disk
+        # Extra columns to keep besides the coordinates (None keeps all)
+        self.columns = columns
+        self._gdf: Optional[gpd.GeoDataFrame] = None
     
-    def load_csv_to_geodataframe(self) -> gpd.GeoDataFrame:
+    def load_csv_to_geodataframe(self, save: Optional[bool] = None) -> gpd.GeoDataFrame:
         """
         Load CSV with coordinates and convert to GeoDataFrame
         
+        The GeoJSON copy is only written when `save` (or, if None,
+        `save_to_disk`) is true.
+        
         Expected CSV columns:
         - latitude/lat/y
         - longitude/lon/x
@@ -22,11 +34,20 @@ class CSVDataLoader(BaseDownloader):
         - type/category (optional)
         - specialty (optional, for specialists)
         """
+        import pandas as pd
+        import geopandas as gpd
+        
         self.logger.info(f"Loading CSV data from {self.csv_path}...")
         
         try:
             #load CSV
-            df = pd.read_csv(self.csv_path)
+            usecols = None
+            if self.columns is not None:
+                usecols = list(dict.fromkeys([self.lat_col, self.lon_col, *self.columns]))
+            try:
+                df = pd.read_csv(self.csv_path, engine='pyarrow', usecols=usecols)
+            except ImportError:
+                df = pd.read_csv(self.csv_path, usecols=usecols)
             self.logger.info(f"Loaded {len(df)} records from CSV")
             
             #Validating columns
@@ -41,14 +62,20 @@ class CSVDataLoader(BaseDownloader):
             self.logger.info(f"Retained {len(df)} records with valid coordinates")
             
             #create GeoDataFrame
-            from shapely.geometry import Point
-            geometry = [Point(xy) for xy in zip(df[self.lon_col], df[self.lat_col])]
-            gdf = gpd.GeoDataFrame(df, geometry=geometry, crs='EPSG:4326')
+            geometry = gpd.points_from_xy(
+                df[self.lon_col].astype('float64').to_numpy(),
+                df[self.lat_col].astype('float64').to_numpy(),
+                crs='EPSG:4326'
+            )
+            gdf = gpd.GeoDataFrame(df, geometry=geometry)
+            
+            self._gdf = gdf
             
             #saving as GeoJSON
-            output_path = self.output_dir / "csv_data.geojson"
-            gdf.to_file(output_path, driver='GeoJSON')
-            self.logger.info(f"Saved GeoJSON to {output_path}")
+            if self.save_to_disk if save is None else save:
+                output_path = self.output_dir / "csv_data.geojson"
+                gdf.to_file(output_path, driver='GeoJSON', engine='pyogrio')
+                self.logger.info(f"Saved GeoJSON to {output_path}")
             
             return gdf
         
@@ -56,7 +83,13 @@ class CSVDataLoader(BaseDownloader):
             self.logger.error(f"Failed to load CSV data: {e}")
             raise
     
+    def get_gdf(self) -> gpd.GeoDataFrame:
+        """Return the in-memory GeoDataFrame, loading it without touching disk"""
+        if self._gdf is None:
+            self.load_csv_to_geodataframe(save=False)
+        return self._gdf
+    
     def download(self) -> str:
         """Load CSV and return path to GeoJSON"""
-        gdf = self.load_csv_to_geodataframe()
+        self.load_csv_to_geodataframe(save=True)
         return str(self.output_dir / "csv_data.geojson")
\ No newline at end of file
@@ -1,5 +1,5 @@
+import shutil
 from typing import Optional
-import requests
 from pathlib import Path
 
 from src.downloader.base import BaseDownloader
@@ -76,11 +76,12 @@ class DEMDownloader(BaseDownloader):
         
         try:
             self.logger.info(f"Requesting DEM for bounds: {bounds}")
-            response = requests.get(base_url, params=params, timeout=300)
-            response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            with self.session.get(base_url, params=params, stream=True, timeout=300) as response:
+                response.raise_for_status()
+                
+                response.raw.decode_content = True
+                with open(output_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f)
             
             self.logger.info(f"DEM downloaded to {output_path}")
             return str(output_path)
@@ -1,5 +1,7 @@
-import requests
 import json
+import os
+import shutil
+from pathlib import Path
 
 from src.downloader.base import BaseDownloader
 
@@ -15,20 +17,37 @@ class HealthsitesDownloader(BaseDownloader):
         self.logger.info(f"Downloading health facilities for {self.country_code}...")
         
         output_path = self.output_dir / "facilities.geojson"
+        # Stream into a partial file; it only replaces output_path once it parses
+        part_path = output_path.with_name(output_path.name + '.part')
         
         try:
             url = f"https://healthsites.io/api/v2/facilities/?country={self.country_code}&limit=10000"
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+            with self.session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                if 'json' not in content_type:
+                    raise ValueError(f"Expected JSON from {url}, got {content_type or 'no content type'}")
+                
+                # Stream the raw bytes to disk instead of parsing and re-serializing
+                response.raw.decode_content = True
+                with open(part_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f)
             
-            facilities_data = response.json()
-            
-            with open(output_path, 'w') as f:
-                json.dump(facilities_data, f)
-            
-            count = len(facilities_data.get('features', []))
+            # Raises on an error page or a truncated body
+            count = self._count_features(part_path)
+            os.replace(part_path, output_path)
             self.logger.info(f"Downloaded {count} health facilities")
             return str(output_path)
         except Exception as e:
+            part_path.unlink(missing_ok=True)
             self.logger.error(f"Failed to download facilities: {e}")
             raise
+    
+    def _count_features(self, path: Path) -> int:
+        """Count features, lazily with ijson if installed; raises on malformed JSON"""
+        with open(path, 'rb') as f:
+            try:
+                import ijson
+            except ImportError:
+                return len(json.load(f).get('features', []))
+            return sum(1 for _ in ijson.items(f, 'features.item'))
@@ -1,13 +1,23 @@
+from typing import List, Optional
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point
 
 class FacilitiesLoader:
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, columns: Optional[List[str]] = None):
         self.csv_path = csv_path
+        # Extra columns to keep besides the coordinates (None keeps all)
+        self.columns = columns
 
     def load(self) -> gpd.GeoDataFrame:
-        df = pd.read_csv(self.csv_path, encoding='latin-1')
+        usecols = None
+        if self.columns is not None:
+            usecols = list(dict.fromkeys(["Latitude", "Longitude", *self.columns]))
+
+        # Arrow's multithreaded CSV parser; fall back to the C engine without pyarrow
+        try:
+            df = pd.read_csv(self.csv_path, encoding='latin-1', engine='pyarrow', usecols=usecols)
+        except ImportError:
+            df = pd.read_csv(self.csv_path, encoding='latin-1', usecols=usecols)
 
         # Check required columns
         if "Latitude" not in df.columns or "Longitude" not in df.columns:
@@ -17,9 +27,13 @@ class FacilitiesLoader:
         df = df.dropna(subset=["Latitude", "Longitude"])
 
         # Create geometry column from lat/lon
-        geometry = [Point(xy) for xy in zip(df["Longitude"], df["Latitude"])]
+        # in WGS84 (EPSG:4326)
+        geometry = gpd.points_from_xy(
+            df["Longitude"].astype('float64').to_numpy(),
+            df["Latitude"].astype('float64').to_numpy(),
+            crs="EPSG:4326"
+        )
 
-        # Create GeoDataFrame with WGS84 (EPSG:4326)
-        gdf = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+        gdf = gpd.GeoDataFrame(df, geometry=geometry)
 
         return gdf
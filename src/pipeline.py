@@ -1,9 +1,23 @@
 from src.logger import Logger
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import geopandas as gpd
+from pyproj import CRS
 from src.config import Config
+from src.analysis.accessibility import AccessibilityAnalyzer
+from src.analysis.statistics import StatisticsAnalyzer
 from src.population.zonal_extractor import PopulationZonalExtractor
 from src.loaders.facilities_loader import FacilitiesLoader
+from src.processor.vector import VectorProcessor
+
+# Route every read_file/to_file through pyogrio instead of Fiona
+gpd.options.io_engine = "pyogrio"
+
+# output.vector_format -> (OGR driver, file suffix); 'parquet' is handled separately
+VECTOR_DRIVERS = {
+    'fgb': ('FlatGeobuf', '.fgb'),
+    'geojson': ('GeoJSON', '.geojson'),
+}
 
 class Pipeline:
     """Main orchestration pipeline"""
@@ -11,6 +25,8 @@ class Pipeline:
     def __init__(self, config: Config):
         self.config = config
         self.logger = Logger.get('Pipeline')
+        # Every vector layer is projected to this CRS once, in process_data
+        self._working_crs = self.config['crs_utm']
         
         # Create directories
         Path(self.config['data_dir']).mkdir(exist_ok=True)
@@ -31,22 +47,33 @@ class Pipeline:
             return boundaries_path, facilities_path
         
         data_dir = Path(self.config['data_dir'])
-        boundaries_path = None
-        facilities_path = None
+        tasks = {}
         
         if download_config.get('boundaries', False):
             from src.downloader.gadm import GADMDownloader
-            downloader = GADMDownloader(str(data_dir / "Administrative_boundaries"))
-            downloader.download()
-            boundaries_path = data_dir / "Administrative_boundaries"
+            tasks['boundaries'] = GADMDownloader(str(data_dir / "Administrative_boundaries"))
         
         if download_config.get('facilities', False):
             from src.downloader.healthsites import HealthsitesDownloader
-            downloader = HealthsitesDownloader(
+            tasks['facilities'] = HealthsitesDownloader(
                 str(data_dir / "Health_facilities"),
                 self.config['iso_code_3166']
             )
-            facilities_path = downloader.download()
+        
+        # Downloads are independent and network-bound, so run them concurrently
+        results = {}
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                executor.submit(downloader.download): name
+                for name, downloader in tasks.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        boundaries_path = (
+            data_dir / "Administrative_boundaries" if 'boundaries' in results else None
+        )
+        facilities_path = results.get('facilities')
         
         return boundaries_path, facilities_path
     
@@ -56,10 +83,6 @@ class Pipeline:
         self.logger.info("STEP 2: Processing Data")
         self.logger.info("="*70)
         
-        from src.processor.vector import VectorProcessor
-        from src.loaders.facilities_loader import FacilitiesLoader
-        from pathlib import Path
-
         processor = VectorProcessor(self.config)
         data_dir = Path(self.config['data_dir'])
         
@@ -70,12 +93,15 @@ class Pipeline:
         shp_path = boundary_files[0]
         
         self.logger.info(f"Loading administrative boundaries from: {shp_path}")
-        boundaries = processor.load_shapefile(str(shp_path))
+        boundaries = processor.load_shapefile(
+            str(shp_path),
+            cache=self.config.get('cache_vectors', False)
+        )
         #boundaries = processor.filter_by_country(
             #boundaries,
             #self.config['country_code']
         #)
-        boundaries = processor.reproject(boundaries, self.config['crs_utm'])
+        boundaries = processor.reproject(boundaries, self._working_crs)
         
         # --- Load health facilities from local CSV ---
         facilities_csv = self.config['facilities']['csv']
@@ -85,9 +111,8 @@ class Pipeline:
         loader = FacilitiesLoader(facilities_csv)
         facilities = loader.load()
 
-        # Match CRS with boundaries
-        if facilities.crs != boundaries.crs:
-            facilities = facilities.to_crs(boundaries.crs)
+        # Project once to the working CRS (shared cached transformer)
+        facilities = processor.reproject(facilities, self._working_crs)
 
         facilities_geojson.parent.mkdir(parents=True, exist_ok=True)
         # Save GeoJSON for reuse (optional)
@@ -107,9 +132,14 @@ class Pipeline:
         self.logger.info("STEP 3: Analyzing Accessibility")
         self.logger.info("="*70)
         
-        from src.analysis.accessibility import AccessibilityAnalyzer
-        from src.analysis.statistics import StatisticsAnalyzer
-
+        # Inputs come from process_data already in the working CRS
+        working_crs = CRS.from_user_input(self._working_crs)
+        if facilities.crs != working_crs or boundaries.crs != working_crs:
+            raise ValueError(
+                f"Facilities ({facilities.crs}) and boundaries ({boundaries.crs}) "
+                f"must be in the working CRS {self._working_crs}"
+            )
+        
         # Create population grid
         accessibility_analyzer = AccessibilityAnalyzer(self.config)
         population_grid = accessibility_analyzer.create_population_grid(boundaries)
@@ -139,13 +169,19 @@ class Pipeline:
         viz_config = self.config['visualization']
         output_dir = self.config['output_dir']
         
+        jobs = []
         if viz_config['generate_facility_map']:
             viz = FacilityMapVisualizer(self.config, output_dir)
-            viz.generate(facilities, boundaries)
+            jobs.append(lambda viz=viz: viz.generate(facilities, boundaries))
         
         if viz_config['generate_accessibility_map']:
             viz = AccessibilityMapVisualizer(self.config, output_dir)
-            viz.generate(accessibility)
+            jobs.append(lambda viz=viz: viz.generate(accessibility))
+        
+        # The maps share no state; build them concurrently (pyproj/shapely/IO release the GIL)
+        if jobs:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                list(executor.map(lambda job: job(), jobs))
     
     def save_outputs(
         self,
@@ -161,25 +197,48 @@ class Pipeline:
         
         output_dir = Path(self.config['output_dir'])
         
-        facilities.to_file(
-            str(output_dir / "facilities_processed.geojson"),
-            driver='GeoJSON'
-        )
-        boundaries.to_file(
-            str(output_dir / "boundaries.geojson"),
-            driver='GeoJSON'
-        )
-        accessibility.to_file(
-            str(output_dir / "accessibility_grid.geojson"),
-            driver='GeoJSON'
+        stats_analyzer = StatisticsAnalyzer(self.config)
+        
+        # Binary formats (FlatGeobuf/GeoParquet) are much faster than GeoJSON
+        output_config = self.config.get('output', {})
+        vector_format = output_config.get('vector_format', 'fgb')
+        layers = {
+            'facilities_processed': facilities,
+            'boundaries': boundaries,
+            'accessibility_grid': accessibility,
+        }
+        jobs = [
+            self._vector_writer(gdf, output_dir / name, vector_format)
+            for name, gdf in layers.items()
+        ]
+        if output_config.get('geojson_compat', False) and vector_format != 'geojson':
+            jobs += [
+                self._vector_writer(gdf, output_dir / name, 'geojson')
+                for name, gdf in layers.items()
+            ]
+        jobs.append(
+            lambda: stats_analyzer.save_stats(stats, str(output_dir / "statistics.json"))
         )
         
-        from src.analysis.statistics import StatisticsAnalyzer
-        stats_analyzer = StatisticsAnalyzer(self.config)
-        stats_analyzer.save_stats(stats, str(output_dir / "statistics.json"))
+        # Independent writes; overlap serialization of one with I/O of another
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            list(executor.map(lambda job: job(), jobs))
         
         self.logger.info("All outputs saved")
     
+    @staticmethod
+    def _vector_writer(gdf: gpd.GeoDataFrame, path: Path, vector_format: str):
+        """Return a callable that writes gdf to path in the given format"""
+        if vector_format == 'parquet':
+            return lambda: gdf.to_parquet(path.with_suffix('.parquet'))
+        if vector_format not in VECTOR_DRIVERS:
+            raise ValueError(
+                f"Unsupported vector_format '{vector_format}', "
+                f"expected one of: parquet, {', '.join(VECTOR_DRIVERS)}"
+            )
+        driver, suffix = VECTOR_DRIVERS[vector_format]
+        return lambda: gdf.to_file(str(path.with_suffix(suffix)), driver=driver)
+    
     def run(self) -> dict:
         """Execute complete pipeline"""
         self.logger.info("\n" + "="*70)
@@ -194,19 +253,13 @@ class Pipeline:
             boundaries, facilities = self.process_data()
 
             # STEP 3: Population zonal statistics (NEW)
-            from src.population.zonal_extractor import PopulationZonalExtractor
-            
             pop_raster_path = self.config['population']['raster']  # path from config.yaml
             pop_output_path = self.config['population']['zonal_output']
 
             self.logger.info("\n" + "="*70)
             self.logger.info("STEP 3: Calculating Population Zonal Statistics")
             self.logger.info("="*70)
-            data_dir = Path(self.config['data_dir'])
-            temp_boundaries_path = data_dir / "temp_boundaries.geojson"
-            boundaries.to_file(temp_boundaries_path, driver="GeoJSON")
-
-            extractor = PopulationZonalExtractor(str(temp_boundaries_path), pop_raster_path)
+            extractor = PopulationZonalExtractor(boundaries, pop_raster_path)
             pop_gdf = extractor.run(pop_output_path)
 
             self.logger.info(f"✓ Population zonal statistics saved to: {pop_output_path}")
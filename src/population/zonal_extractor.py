@@ -1,46 +1,105 @@
+from typing import Optional, Union
 import geopandas as gpd
 import rasterio
-from rasterstats import zonal_stats
+import shapely
+from src._transformer import to_crs_cached
+from src.logger import Logger
+from src.processor.raster import run_zonal_stats, zonal_stats_source
+from src.processor.vector import read_vector
+
+# Per-geometry failures logged individually before only the total is reported
+MAX_LOGGED_FAILURES = 10
 
 class PopulationZonalExtractor:
-    def __init__(self, boundary_path: str, raster_path: str):
-        self.boundary_path = boundary_path
+    def __init__(
+        self,
+        boundaries: Union[str, gpd.GeoDataFrame],
+        raster_path: str,
+        n_workers: int = 1,
+        batch_size: Optional[int] = None
+    ):
+        # Either a path to a vector file or an already loaded GeoDataFrame
+        self.boundaries = boundaries
         self.raster_path = raster_path
+        self.n_workers = n_workers
+        self.batch_size = batch_size
+        self.logger = Logger.get(self.__class__.__name__)
 
     def run(self, output_path: str):
-        # Load boundaries
-        gdf = gpd.read_file(self.boundary_path)
+        # Load boundaries (skipped when a GeoDataFrame was passed in)
+        if isinstance(self.boundaries, gpd.GeoDataFrame):
+            gdf = self.boundaries
+        else:
+            gdf = read_vector(self.boundaries)
 
-        # Open raster and match CRS
+        # Open raster and match CRS, reading the band into memory once if it fits
         with rasterio.open(self.raster_path) as src:
             if gdf.crs != src.crs:
-                gdf = gdf.to_crs(src.crs)
-
-            populations = []
-            for idx, row in gdf.iterrows():
-                try:
-                    stat = zonal_stats(
-                        [row.geometry],
-                        self.raster_path,
-                        stats=['sum'],
-                        nodata=src.nodata,
-                        all_touched=False,
-                    )
-                    pop = stat[0]['sum'] if stat[0]['sum'] is not None else 0
-                except Exception as e:
-                    print(f"Warning: Failed to process geometry {idx}: {e}")
-                    pop = 0
-                populations.append(pop)
-            gdf['population'] = populations
-
-        # Attach stats to the GeoDataFrame
-        #gdf["pop_sum"] = [s["sum"] for s in stats]
-        #gdf["pop_mean"] = [s["mean"] for s in stats]
-
-        # Add stats to GeoDataFrame
-        #gdf['population'] = [s['sum'] if s['sum'] is not None else 0 for s in stats]
-        #gdf['pop_mean'] = [s['mean'] if s['mean'] is not None else 0 for s in stats]
+                gdf = to_crs_cached(gdf, src.crs)
+            nodata = src.nodata
+            raster_bounds = src.bounds
+
+        # One zonal_stats call over all polygons (batched across processes if n_workers > 1)
+        try:
+            stats = run_zonal_stats(
+                gdf,
+                self.raster_path,
+                n_workers=self.n_workers,
+                batch_size=self.batch_size,
+                stats=['sum'],
+                nodata=nodata,
+                all_touched=False,
+                geojson_out=False,
+            )
+            populations = [s['sum'] if s['sum'] is not None else 0 for s in stats]
+        except Exception as e:
+            self.logger.warning(
+                f"Batch zonal statistics failed ({e}); retrying per geometry"
+            )
+            with rasterio.open(self.raster_path) as src:
+                raster_source = zonal_stats_source(src, gdf.total_bounds)
+            populations = self._per_geometry(gdf, raster_source, nodata, raster_bounds)
+        # assign() returns a new frame so a caller's GeoDataFrame isn't mutated
+        gdf = gdf.assign(population=populations)
 
         # Save to GeoJSON
-        gdf.to_file(output_path, driver="GeoJSON")
+        gdf.to_file(output_path, driver="GeoJSON", engine="pyogrio")
         return gdf
+
+    def _per_geometry(
+        self,
+        gdf: gpd.GeoDataFrame,
+        raster_source: dict,
+        nodata,
+        raster_bounds
+    ) -> list:
+        # Slow path: isolate the geometries that fail so the rest still get values
+        from rasterstats import zonal_stats
+
+        # Geometries that miss the raster entirely get 0 without a zonal_stats call
+        inside = shapely.intersects(gdf.geometry.values, shapely.box(*raster_bounds))
+
+        populations = []
+        failed = 0
+        for (idx, geom), hit in zip(gdf.geometry.items(), inside):
+            if not hit:
+                populations.append(0)
+                continue
+            try:
+                stat = zonal_stats(
+                    [geom],
+                    **raster_source,
+                    stats=['sum'],
+                    nodata=nodata,
+                    all_touched=False,
+                )
+                pop = stat[0]['sum'] if stat[0]['sum'] is not None else 0
+            except Exception as e:
+                failed += 1
+                if failed <= MAX_LOGGED_FAILURES:
+                    self.logger.warning(f"Failed to process geometry {idx}: {e}")
+                pop = 0
+            populations.append(pop)
+        if failed:
+            self.logger.warning(f"{failed} geometries failed zonal_stats")
+        return populations
@@ -1,6 +1,4 @@
 from abc import ABC, abstractmethod
-import geopandas as gpd
-
 from src.logger import Logger
 from src.config import Config
 
@@ -1,23 +1,169 @@
+import importlib.util
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
 import rasterio
+from rasterio.errors import WindowError
 from rasterio.mask import mask
 from rasterio.warp import calculate_default_transform, reproject, Resampling
 from rasterio.merge import merge
+from rasterio.windows import Window, from_bounds
 import numpy as np
 import geopandas as gpd
+import shapely
+from pyproj import CRS
+from src._transformer import to_crs_cached
+from src.config import Config
 from src.processor.base import BaseProcessor
 
+# Rasters up to this size are read into memory once for zonal statistics
+IN_MEMORY_RASTER_MAX_BYTES = 512 * 1024 ** 2
+
+# Above this many zones, use exactextract's raster-sweep backend if installed
+EXACTEXTRACT_MIN_ZONES = 500
+
+
+def _padded_window(src, bounds) -> Optional[Window]:
+    """Pixel window covering `bounds`, or None if it misses the raster"""
+    window = from_bounds(*bounds, transform=src.transform)
+    # Pad to whole pixels so edge cells are not lost to rounding
+    window = Window(
+        math.floor(window.col_off) - 1,
+        math.floor(window.row_off) - 1,
+        math.ceil(window.width) + 2,
+        math.ceil(window.height) + 2
+    )
+    try:
+        return window.intersection(Window(0, 0, src.width, src.height))
+    except WindowError:
+        return None
+
+
+def zonal_stats_source(src, bounds=None) -> dict:
+    """
+    zonal_stats raster kwargs: the in-memory band if it fits, else the path
+    
+    With `bounds` (in the raster CRS) only the window covering them is
+    read, so zones over a small part of a large raster stay in memory.
+    """
+    window = None
+    if bounds is not None and np.isfinite(bounds).all():
+        window = _padded_window(src, bounds)
+        if window is None:
+            # Zones lie entirely outside the raster
+            return {'raster': src.name}
+    width, height = (window.width, window.height) if window else (src.width, src.height)
+    nbytes = width * height * np.dtype(src.dtypes[0]).itemsize
+    if nbytes > IN_MEMORY_RASTER_MAX_BYTES:
+        return {'raster': src.name}
+    if window is None:
+        return {'raster': src.read(1), 'affine': src.transform}
+    return {'raster': src.read(1, window=window), 'affine': src.window_transform(window)}
+
+
+def _zonal_stats_batch(raster_path: str, geometries: list, kwargs: dict) -> list:
+    """Worker: read only the window covering this batch, then run zonal_stats"""
+    from rasterstats import zonal_stats
+    
+    with rasterio.open(raster_path) as src:
+        bounds = gpd.GeoSeries(geometries).total_bounds
+        window = _padded_window(src, bounds)
+        if window is None:
+            # Batch lies entirely outside the raster
+            return zonal_stats(geometries, raster_path, **kwargs)
+        data = src.read(1, window=window)
+        affine = src.window_transform(window)
+    return zonal_stats(geometries, data, affine=affine, **kwargs)
+
+
+def run_zonal_stats(
+    vectors: gpd.GeoDataFrame,
+    raster_path: str,
+    n_workers: int = 1,
+    batch_size: Optional[int] = None,
+    src: Optional[rasterio.DatasetReader] = None,
+    **kwargs
+) -> list:
+    """
+    zonal_stats over all geometries in `vectors`
+    
+    With n_workers > 1 the geometries are split into batches (of
+    `batch_size`, default one batch per worker) that run in a process
+    pool, each reading only its own raster window. The serial path
+    likewise reads just the window under all geometries; an already
+    open dataset can be passed as `src` to reuse it there.
+    """
+    from rasterstats import zonal_stats
+    
+    geometries = list(vectors.geometry)
+    if n_workers <= 1 or len(geometries) <= 1:
+        bounds = vectors.total_bounds
+        if src is not None:
+            raster_source = zonal_stats_source(src, bounds)
+        else:
+            with rasterio.open(raster_path) as dataset:
+                raster_source = zonal_stats_source(dataset, bounds)
+        return zonal_stats(geometries, **raster_source, **kwargs)
+    
+    if batch_size is None:
+        batch_size = math.ceil(len(geometries) / n_workers)
+    batches = [
+        geometries[i:i + batch_size]
+        for i in range(0, len(geometries), batch_size)
+    ]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = executor.map(
+            _zonal_stats_batch,
+            [raster_path] * len(batches),
+            batches,
+            [kwargs] * len(batches)
+        )
+        return [stat for batch in results for stat in batch]
+
 class RasterProcessor(BaseProcessor):
     """Process raster (GeoTIFF, DEM, population) data"""
     
+    def __init__(self, config: Config):
+        super().__init__(config)
+        # Open datasets reused across helpers so GDAL keeps its block cache
+        self._open_cache: Dict[Tuple[str, Optional[int]], rasterio.DatasetReader] = {}
+    
+    def _dataset(self, raster_path: str) -> rasterio.DatasetReader:
+        """
+        Cached read-only dataset for `raster_path`
+        
+        Keyed on path and modification time, so a raster rewritten in
+        place is reopened. Handles stay open until close_all(), which is
+        the only place that closes them.
+        """
+        path = str(raster_path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # Not a local file (e.g. a GDAL virtual path)
+            mtime = None
+        src = self._open_cache.get((path, mtime))
+        if src is None:
+            src = rasterio.open(path)
+            self._open_cache[(path, mtime)] = src
+        return src
+    
+    def close_all(self) -> None:
+        """Close every cached dataset, including ones superseded by a rewrite"""
+        cache = getattr(self, '_open_cache', {})
+        for src in cache.values():
+            src.close()
+        cache.clear()
+    
+    def __del__(self):
+        self.close_all()
+    
     def load_raster(self, raster_path: str) -> tuple:
         """Load raster data"""
         self.logger.info(f"Loading raster: {raster_path}")
-        with rasterio.open(raster_path) as src:
-            data = src.read(1)
-            transform = src.transform
-            crs = src.crs
-            bounds = src.bounds
-        return data, transform, crs, bounds
+        src = self._dataset(raster_path)
+        return src.read(1), src.transform, src.crs, src.bounds
     
     def clip_raster(
         self,
@@ -28,28 +174,27 @@ class RasterProcessor(BaseProcessor):
         """Clip raster to bounds"""
         self.logger.info("Clipping raster to boundaries")
         
+        src = self._dataset(raster_path)
         # Ensure clip_bounds is in same CRS
-        with rasterio.open(raster_path) as src:
-            if clip_bounds.crs != src.crs:
-                clip_bounds = clip_bounds.to_crs(src.crs)
-        
-        shapes = [geom for geom in clip_bounds.geometry]
-        
-        with rasterio.open(raster_path) as src:
-            clipped_data, clipped_transform = mask(
-                src,
-                shapes,
-                crop=True,
-                all_touched=True
-            )
-            
-            self._save_raster(
-                output_path,
-                clipped_data,
-                clipped_transform,
-                src.crs,
-                src.nodata
-            )
+        if clip_bounds.crs != src.crs:
+            clip_bounds = to_crs_cached(clip_bounds, src.crs)
+        
+        # Geometries are consumed as an iterable; only band 1 is read
+        clipped_data, clipped_transform = mask(
+            src,
+            clip_bounds.geometry,
+            crop=True,
+            all_touched=True,
+            indexes=1
+        )
+        
+        self._save_raster(
+            output_path,
+            clipped_data,
+            clipped_transform,
+            src.crs,
+            src.nodata
+        )
         
         self.logger.info(f"Clipped raster saved to {output_path}")
         return output_path
@@ -63,7 +208,9 @@ class RasterProcessor(BaseProcessor):
         """Reproject raster to target CRS"""
         self.logger.info(f"Reprojecting raster to EPSG:{target_crs}")
         
-        with rasterio.open(raster_path) as src:
+        src = self._dataset(raster_path)
+        # Larger GDAL block cache for the warp
+        with rasterio.Env(GDAL_CACHEMAX=512):
             transform, width, height = calculate_default_transform(
                 src.crs,
                 f'EPSG:{target_crs}',
@@ -89,7 +236,9 @@ class RasterProcessor(BaseProcessor):
                         src_crs=src.crs,
                         dst_transform=transform,
                         dst_crs=f'EPSG:{target_crs}',
-                        resampling=Resampling.bilinear
+                        resampling=Resampling.bilinear,
+                        num_threads=os.cpu_count() or 1,
+                        warp_mem_limit=512
                     )
         
         self.logger.info(f"Reprojected raster saved to {output_path}")
@@ -132,7 +281,9 @@ class RasterProcessor(BaseProcessor):
     def extract_population_by_zones(
         self,
         population_raster_path: str,
-        zones: gpd.GeoDataFrame
+        zones: gpd.GeoDataFrame,
+        n_workers: int = 1,
+        batch_size: Optional[int] = None
     ) -> gpd.GeoDataFrame:
         """
         Extract population statistics for each administrative zone
@@ -140,25 +291,41 @@ class RasterProcessor(BaseProcessor):
         """
         self.logger.info("Extracting population by administrative zones")
         
-        from rasterstats import zonal_stats
-        
         # Ensure zones are in same CRS as raster
-        with rasterio.open(population_raster_path) as src:
-            if zones.crs != src.crs:
-                zones = zones.to_crs(src.crs)
-        
-        # Calculate zonal statistics
-        stats = zonal_stats(
-            zones,
-            population_raster_path,
-            stats=['sum', 'mean', 'count'],
-            nodata=-200  # Common nodata value for population rasters
-        )
+        src = self._dataset(population_raster_path)
+        if zones.crs != src.crs:
+            zones = to_crs_cached(zones, src.crs)
         
-        # Add statistics to GeoDataFrame
-        zones['population_sum'] = [s['sum'] for s in stats]
-        zones['population_mean'] = [s['mean'] for s in stats]
-        zones['population_count'] = [s['count'] for s in stats]
+        if len(zones) > EXACTEXTRACT_MIN_ZONES and importlib.util.find_spec('exactextract'):
+            # Single raster sweep for all polygons instead of one rasterization each
+            from exactextract import exact_extract
+            
+            self.logger.info(f"Using exactextract for {len(zones)} zones")
+            result = exact_extract(
+                population_raster_path,
+                zones,
+                ['sum', 'mean', 'count'],
+                output='pandas'
+            )
+            zones['population_sum'] = result['sum'].to_numpy()
+            zones['population_mean'] = result['mean'].to_numpy()
+            zones['population_count'] = result['count'].to_numpy()
+        else:
+            # Calculate zonal statistics
+            stats = run_zonal_stats(
+                zones,
+                population_raster_path,
+                n_workers=n_workers,
+                batch_size=batch_size,
+                src=src,
+                stats=['sum', 'mean', 'count'],
+                nodata=-200  # Common nodata value for population rasters
+            )
+            
+            # Add statistics to GeoDataFrame
+            zones['population_sum'] = [s['sum'] for s in stats]
+            zones['population_mean'] = [s['mean'] for s in stats]
+            zones['population_count'] = [s['count'] for s in stats]
         
         self.logger.info("Population extraction complete")
         return zones
@@ -167,27 +334,44 @@ class RasterProcessor(BaseProcessor):
         self,
         population_raster_path: str,
         facilities: gpd.GeoDataFrame,
-        distance_km: float
+        distance_km: float,
+        n_workers: int = 1,
+        batch_size: Optional[int] = None
     ) -> gpd.GeoDataFrame:
         """
         Calculate population within distance of each facility
         """
         self.logger.info(f"Calculating population within {distance_km}km of facilities")
         
-        from rasterstats import zonal_stats
-        
-        # Create buffers around facilities
-        facilities_buffered = facilities.copy()
-        facilities_buffered['geometry'] = facilities.geometry.buffer(distance_km * 1000)
+        # Buffer in metres: project to UTM first (skipped if already there),
+        # then reproject the buffers once to the raster CRS below
+        facilities_utm = facilities
+        if facilities_utm.crs != CRS.from_user_input(self.config['crs_utm']):
+            facilities_utm = to_crs_cached(facilities_utm, self.config['crs_utm'])
+        # Geometry-only frame: zonal_stats needs nothing else, so skip copying attributes.
+        # quad_segs=16 matches GeoSeries.buffer, so catchments (and sums) are unchanged
+        buffers = shapely.buffer(
+            facilities_utm.geometry.to_numpy(),
+            distance_km * 1000,
+            quad_segs=16
+        )
+        facilities_buffered = gpd.GeoDataFrame(
+            {'geometry': buffers},
+            crs=facilities_utm.crs,
+            index=facilities_utm.index
+        )
         
         # Extract population within buffers
-        with rasterio.open(population_raster_path) as src:
-            if facilities_buffered.crs != src.crs:
-                facilities_buffered = facilities_buffered.to_crs(src.crs)
+        src = self._dataset(population_raster_path)
+        if facilities_buffered.crs != src.crs:
+            facilities_buffered = to_crs_cached(facilities_buffered, src.crs)
         
-        stats = zonal_stats(
+        stats = run_zonal_stats(
             facilities_buffered,
             population_raster_path,
+            n_workers=n_workers,
+            batch_size=batch_size,
+            src=src,
             stats=['sum'],
             nodata=-200
         )
@@ -208,6 +392,8 @@ class RasterProcessor(BaseProcessor):
         nodata=None
     ) -> None:
         """Save raster to file"""
+        if data.ndim == 2:
+            data = data[np.newaxis, ...]
         with rasterio.open(
             path,
             'w',
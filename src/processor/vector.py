@@ -1,20 +1,82 @@
+import importlib.util
+import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 import geopandas as gpd
+import numpy as np
+import shapely
+from src._transformer import to_crs_cached
 from src.processor.base import BaseProcessor
 
+
+def read_vector(path: str) -> gpd.GeoDataFrame:
+    """Read a vector file via pyogrio, with Arrow transfer when pyarrow is installed"""
+    use_arrow = importlib.util.find_spec('pyarrow') is not None
+    return gpd.read_file(path, engine='pyogrio', use_arrow=use_arrow)
+
+
+def read_vector_cached(path: str) -> gpd.GeoDataFrame:
+    """
+    read_vector backed by a GeoParquet snapshot next to the source
+
+    The snapshot is reused while it is newer than every file of the
+    dataset (e.g. .shp/.dbf/.prj) and rewritten otherwise. It is written
+    to a temporary file and renamed into place, so an interrupted run
+    never leaves a truncated snapshot; one that still fails to read is
+    deleted and the source is read instead. Without pyarrow this is
+    plain read_vector.
+    """
+    if importlib.util.find_spec('pyarrow') is None:
+        return read_vector(path)
+    
+    source = Path(path)
+    snapshot = source.with_suffix('.parquet')
+    source_mtime = max(
+        p.stat().st_mtime
+        for p in source.parent.glob(f"{source.stem}.*")
+        if p != snapshot
+    )
+    if snapshot.exists() and snapshot.stat().st_mtime >= source_mtime:
+        try:
+            return gpd.read_parquet(snapshot)
+        except (OSError, ValueError):
+            # Unreadable snapshot: drop it and rebuild from the source
+            snapshot.unlink(missing_ok=True)
+    
+    gdf = read_vector(path)
+    try:
+        fd, tmp_name = tempfile.mkstemp(
+            dir=snapshot.parent, prefix=f".{snapshot.name}.", suffix='.tmp'
+        )
+    except OSError:
+        # Read-only data directory: the snapshot is only an optimisation
+        return gdf
+    os.close(fd)
+    try:
+        gdf.to_parquet(tmp_name)
+        os.replace(tmp_name, snapshot)
+    except OSError:
+        pass
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+    return gdf
+
+
 class VectorProcessor(BaseProcessor):
     """Process vector (shapefile, geojson) data"""
     
-    def load_shapefile(self, shapefile_path: str) -> gpd.GeoDataFrame:
-        """Load shapefile"""
+    def load_shapefile(self, shapefile_path: str, cache: bool = False) -> gpd.GeoDataFrame:
+        """Load shapefile (via a GeoParquet snapshot when `cache` is true)"""
         self.logger.info(f"Loading shapefile: {shapefile_path}")
-        return gpd.read_file(shapefile_path)
+        if cache:
+            return read_vector_cached(shapefile_path)
+        return read_vector(shapefile_path)
     
     def load_geojson(self, geojson_path: str) -> gpd.GeoDataFrame:
         """Load GeoJSON"""
         self.logger.info(f"Loading GeoJSON: {geojson_path}")
-        return gpd.read_file(geojson_path)
+        return read_vector(geojson_path)
     
     def filter_by_country(
         self,
@@ -33,12 +95,20 @@ class VectorProcessor(BaseProcessor):
         self.logger.info(f"Reprojecting to {crs}")
         if gdf.crs is None:
             gdf.set_crs(self.config['crs_wgs84'], inplace=True)
-        return gdf.to_crs(crs=crs)
+        return to_crs_cached(gdf, crs)
     
-    def remove_empty_geometry(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-        """Remove features with empty geometry"""
+    def remove_empty_geometry(
+        self,
+        gdf: gpd.GeoDataFrame,
+        drop_invalid: bool = False
+    ) -> gpd.GeoDataFrame:
+        """Remove features with empty (and optionally invalid) geometry"""
         before = len(gdf)
-        gdf = gdf[~gdf.geometry.is_empty].copy()
+        geoms = gdf.geometry.to_numpy()
+        mask = ~shapely.is_empty(geoms)
+        if drop_invalid:
+            mask &= shapely.is_valid(geoms)
+        gdf = gdf.loc[mask].copy()
         removed = before - len(gdf)
         self.logger.info(f"Removed {removed} features with empty geometry")
         return gdf
@@ -50,7 +120,13 @@ class VectorProcessor(BaseProcessor):
     ) -> gpd.GeoDataFrame:
         """Clip data to boundary"""
         self.logger.info("Clipping data to boundaries")
-        clipped = gpd.clip(gdf, bounds)
+        if len(gdf) and (gdf.geom_type == 'Point').all():
+            # Points need no geometric intersection: an STRtree predicate query
+            # on the boundaries' spatial index gives the same features
+            input_idx, _ = bounds.sindex.query(gdf.geometry, predicate='intersects')
+            clipped = gdf.iloc[np.unique(input_idx)]
+        else:
+            clipped = gpd.clip(gdf, bounds)
         self.logger.info(f"Retained {len(clipped)} features after clipping")
         return clipped
     
@@ -0,0 +1,24 @@
+from numba import njit, prange
+
+#distance -> colour bin in one parallel pass, writing into a caller-allocated
+#output; eager signature + cache=True avoids cold JIT. No fastmath: NaN
+#distances must still land in the last bin
+@njit(
+    'void(f8[::1], f8[::1], i8[::1])',
+    parallel=True,
+    cache=True,
+    boundscheck=False
+)
+def color_bins(distance_km, edges, color_idx):
+    n_edges = edges.shape[0]
+
+    for i in prange(distance_km.shape[0]):
+        d = distance_km[i]
+        if d != d:
+            color_idx[i] = n_edges
+            continue
+        #half-open [lower, upper) bins, same as searchsorted(side='right')
+        c = 0
+        while c < n_edges and d >= edges[c]:
+            c += 1
+        color_idx[i] = c
@@ -1,8 +1,45 @@
+import gzip
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Optional, Tuple
+import folium
+import geopandas as gpd
+import numpy as np
+import shapely
+from pyproj import CRS
+from src._transformer import cached_transformer, to_crs_cached
 from src.logger import Logger
 from src.config import Config
 
+WGS84 = CRS.from_epsg(4326)
+
+
+def wgs84_bounds(gdf: gpd.GeoDataFrame) -> tuple:
+    """(minx, miny, maxx, maxy) of gdf in WGS84"""
+    if gdf.crs is None:
+        return tuple(gdf.total_bounds)
+    return tuple(to_crs_cached(gdf, WGS84).total_bounds)
+
+
+def clip_to_bbox(gdf: gpd.GeoDataFrame, bbox: tuple) -> gpd.GeoDataFrame:
+    """
+    Rows of gdf intersecting the WGS84 `bbox`, in their original order
+
+    The box is transformed to the frame's CRS and queried against its
+    (cached) STRtree, so the frame itself is not reprojected.
+    """
+    if gdf.crs is not None and CRS.from_user_input(gdf.crs) != WGS84:
+        transformer = cached_transformer(WGS84.to_wkt(), gdf.crs.to_wkt())
+        bbox = transformer.transform_bounds(*bbox)
+    idx = gdf.sindex.query(shapely.box(*bbox), predicate='intersects')
+    return gdf.iloc[np.sort(idx)]
+
+
+def pixel_size_deg(zoom: int) -> float:
+    """Width of one pixel in degrees of longitude at `zoom` (256px web tiles)"""
+    return 360 / (256 * 2 ** zoom)
+
+
 class BaseVisualizer(ABC):
     """Abstract base class for visualizations"""
     
@@ -12,6 +49,52 @@ class BaseVisualizer(ABC):
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.logger = Logger.get(self.__class__.__name__)
     
+    def _base_map(self, gdf: gpd.GeoDataFrame, **map_kwargs) -> Tuple[folium.Map, int]:
+        """
+        folium Map centred on the configured viewport, else on gdf's
+        extent, together with the zoom level it was created at
+        """
+        viz_config = self.config.get('visualization', {})
+        zoom = viz_config.get('zoom_level', self.config.get('zoom_level', 10))
+        bounds = self._viewport() or wgs84_bounds(gdf)  # [minx, miny, maxx, maxy]
+        center = [(bounds[1] + bounds[3]) / 2, (bounds[0] + bounds[2]) / 2]  # [lat, lon]
+        return folium.Map(location=center, zoom_start=zoom, **map_kwargs), zoom
+    
+    def _save_map(self, m: folium.Map, filename: str) -> Path:
+        """
+        Write m to output_dir/filename, streaming the page template to
+        the file instead of building the whole HTML string first
+        
+        With visualization.gzip_html the page is compressed on the fly
+        and written as filename + '.gz'. Streaming uses branca internals;
+        if those are missing the page is rendered whole with Figure.render.
+        """
+        root = m.get_root()
+        children = getattr(root, '_children', None)
+        template = getattr(root, '_template', None)
+        streamable = children is not None and hasattr(template, 'stream')
+        
+        output_path = self.output_dir / filename
+        if self.config.get('visualization', {}).get('gzip_html', False):
+            output_path = output_path.with_name(output_path.name + '.gz')
+            f = gzip.open(output_path, 'wt', encoding='utf-8')
+        else:
+            f = open(output_path, 'w', encoding='utf-8')
+        with f:
+            if streamable:
+                # Same steps as Figure.render: children fill the header/html/script sections
+                for child in children.values():
+                    child.render()
+                template.stream(this=root, kwargs={}).dump(f)
+            else:
+                f.write(root.render())
+        return output_path
+    
+    def _viewport(self) -> Optional[tuple]:
+        """Configured WGS84 map extent (minx, miny, maxx, maxy), if any"""
+        bbox = self.config.get('visualization', {}).get('bbox')
+        return tuple(bbox) if bbox else None
+    
     @abstractmethod
     def generate(self, *args, **kwargs) -> str:
         """Generate visualization"""
@@ -1,6 +1,72 @@
+import importlib.util
 import folium
+from branca.element import MacroElement
+from folium.plugins import FastMarkerCluster
+from jinja2 import Template
 import geopandas as gpd
-from src.visualization.base import BaseVisualizer
+import numpy as np
+import pandas as pd
+import shapely
+from src._transformer import to_crs_cached
+from src.visualization.base import (
+    BaseVisualizer,
+    clip_to_bbox,
+    pixel_size_deg,
+)
+
+# Decimal places kept in emitted lon/lat (1e-6 deg is ~0.1 m)
+COORD_DECIMALS = 6
+
+# JS marker factory for FastMarkerCluster; row = [lat, lon, name]
+FACILITY_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 5, color: 'red', fill: true, fillOpacity: 0.7
+    });
+    marker.bindPopup('Facility: ' + row[2]);
+    return marker;
+};
+"""
+
+# Accessibility popup; point = [lat, lon, color, radius, distance_km, count]
+DISTANCE_POPUP = """
+function (p) {
+    var text = 'Distance: ' + p[4].toFixed(2) + ' km';
+    return p[5] > 1 ? text + ' (mean of ' + p[5] + ' points)' : text;
+}
+"""
+
+
+class CircleMarkerLayer(MacroElement):
+    """
+    Circle markers created by one JS loop over an embedded point array
+    
+    Each point is [lat, lon, color, radius, ...]; `popup` is a JS
+    function that builds a marker's popup text from its point. The
+    template is compiled once at import, and rendering it formats a
+    single JSON array instead of one template per marker.
+    """
+    
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.featureGroup().addTo({{ this._parent.get_name() }});
+        var {{ this.get_name() }}_popup = {{ this.popup }};
+        {{ this.points|tojson }}.forEach(function (p) {
+            L.circleMarker([p[0], p[1]], {
+                radius: p[3], color: p[2], fillColor: p[2],
+                fill: true, fillOpacity: {{ this.fill_opacity }}
+            }).bindPopup({{ this.get_name() }}_popup(p)).addTo({{ this.get_name() }});
+        });
+        {% endmacro %}
+    """)
+    
+    def __init__(self, points: list, popup: str, fill_opacity: float = 0.7):
+        super().__init__()
+        self._name = 'CircleMarkerLayer'
+        self.points = points
+        self.popup = popup
+        self.fill_opacity = fill_opacity
+
 
 class FacilityMapVisualizer(BaseVisualizer):
     """Generate facility location map"""
@@ -8,35 +74,62 @@ class FacilityMapVisualizer(BaseVisualizer):
     def generate(self, facilities: gpd.GeoDataFrame, boundaries: gpd.GeoDataFrame) -> str:
         """Generate facility map"""
         self.logger.info("Generating facility map...")
-        bounds = boundaries.to_crs('EPSG:4326').total_bounds  # [minx, miny, maxx, maxy]
-        center = [(bounds[1] + bounds[3]) / 2, (bounds[0] + bounds[2]) / 2]  # [lat, lon]
-        zoom = self.config.get('zoom_level', 10)  # Default to 10 if not specified
+        # Only features inside a configured viewport are rendered
+        viewport = self._viewport()
+        if viewport is not None:
+            boundaries = clip_to_bbox(boundaries, viewport)
+            facilities = clip_to_bbox(facilities, viewport)
+        m, zoom = self._base_map(boundaries)
         
-        m = folium.Map(location=center, zoom_start=zoom)
-        
-        # Add boundaries
+        # Add boundaries, simplified for display (tolerance in degrees, by default
+        # one screen pixel at the initial zoom) and handed over as a dict to skip
+        # the JSON string round-trip
+        tolerance = self.config.get('visualization', {}).get(
+            'simplify_tolerance',
+            pixel_size_deg(zoom)
+        )
+        # The layer has no popup or tooltip, so no attribute is ever shown: ship
+        # geometry only (no datetime or other non-JSON values to convert)
+        boundaries_wgs84 = to_crs_cached(boundaries[[boundaries.geometry.name]], 'EPSG:4326')
+        if tolerance:
+            # Sub-pixel detail is invisible, so topology need not be preserved
+            boundaries_wgs84.geometry = boundaries_wgs84.geometry.simplify(
+                tolerance,
+                preserve_topology=False
+            )
+        # Snap vertices to the emitted precision so the JSON carries short floats
+        boundaries_wgs84.geometry = shapely.set_precision(
+            boundaries_wgs84.geometry.values,
+            10.0 ** -COORD_DECIMALS,
+            mode='pointwise'
+        )
         folium.GeoJson(
-            boundaries.copy().assign(**{
-                col: boundaries[col].astype(str)
-                for col in boundaries.select_dtypes(include=['datetime64']).columns
-            }).to_json(),
+            boundaries_wgs84.__geo_interface__,
             style_function=lambda x: {'color': 'blue', 'weight': 2, 'fillOpacity': 0.1}
         ).add_to(m)
         
-        # Add facilities
-        for idx, row in facilities.iterrows():
-            coords = [row.geometry.y, row.geometry.x]
-            folium.CircleMarker(
-                coords,
-                radius=5,
-                popup=f"Facility: {row.get('name', 'Unknown')}",
-                color='red',
-                fill=True,
-                fillOpacity=0.7
-            ).add_to(m)
+        # Add facilities as one clustered layer built from a (lat, lon, name) array
+        facilities_wgs84 = to_crs_cached(facilities, 'EPSG:4326')
+        geoms = facilities_wgs84.geometry.values
+        # get_coordinates skips empty geometries, so drop them to keep rows aligned
+        has_point = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+        coords = shapely.get_coordinates(geoms[has_point])  # (N, 2) lon, lat
+        coords = np.round(coords, COORD_DECIMALS)
+        if 'name' in facilities_wgs84.columns:
+            names = facilities_wgs84['name'].fillna('Unknown').astype(str)
+        else:
+            names = pd.Series('Unknown', index=facilities_wgs84.index)
+        rows = pd.DataFrame({
+            'lat': coords[:, 1],
+            'lon': coords[:, 0],
+            'name': names.to_numpy()[has_point],
+        })
+        FastMarkerCluster(
+            rows.values.tolist(),
+            callback=FACILITY_MARKER_CALLBACK
+        ).add_to(m)
         
-        output_path = self.output_dir / "facility_map.html"
-        m.save(str(output_path))
+        output_path = self._save_map(m, "facility_map.html")
         self.logger.info(f"Facility map saved to {output_path}")
         return str(output_path)
 
@@ -44,41 +137,112 @@ class FacilityMapVisualizer(BaseVisualizer):
 class AccessibilityMapVisualizer(BaseVisualizer):
     """Generate accessibility choropleth map"""
     
+    # Upper edges (km) of the distance bins and the marker colour for each;
+    # the last colour covers everything at or above the last edge (and NaN)
+    DISTANCE_EDGES = np.array([5.0, 10.0, 20.0])
+    DISTANCE_COLORS = np.array(['green', 'yellow', 'orange', 'red'])
+    
+    # Above this many points, bin colours with the parallel Numba kernel
+    NUMBA_MIN_POINTS = 1_000_000
+    
+    # Marker radius (px) for a single point; merged cells grow with sqrt(count)
+    MARKER_RADIUS = 5
+    MAX_MARKER_RADIUS = 15
+    
     def generate(self, accessibility: gpd.GeoDataFrame) -> str:
         """Generate accessibility map"""
         self.logger.info("Generating accessibility map...")
         
-        bounds = accessibility.to_crs('EPSG:4326').total_bounds
-        center = [(bounds[1] + bounds[3]) / 2, (bounds[0] + bounds[2]) / 2]
-        zoom = self.config.get('zoom_level', 10)
+        viewport = self._viewport()
+        if viewport is not None:
+            accessibility = clip_to_bbox(accessibility, viewport)
         
-        m = folium.Map(location=center, zoom_start=zoom)
+        # Draw the (many) circle markers on one canvas instead of one SVG node each
+        m, zoom = self._base_map(accessibility, prefer_canvas=True)
         
-        # Add accessibility data
-        for idx, row in accessibility.iterrows():
-            coords = [row.geometry.y, row.geometry.x]
-            distance_km = row['distance_to_facility_km']
-            
-            # Color based on distance
-            if distance_km < 5:
-                color = 'green'
-            elif distance_km < 10:
-                color = 'yellow'
-            elif distance_km < 20:
-                color = 'orange'
-            else:
-                color = 'red'
-            
-            folium.CircleMarker(
-                coords,
-                radius=5,
-                popup=f"Distance: {distance_km:.2f} km",
-                color=color,
-                fill=True,
-                fillOpacity=0.7
-            ).add_to(m)
+        accessibility_wgs84 = to_crs_cached(accessibility, 'EPSG:4326')
+        lonlat = shapely.get_coordinates(accessibility_wgs84.geometry.values)
+        
+        # Color based on distance, binned for all points at once
+        distance_km = accessibility_wgs84['distance_to_facility_km'].to_numpy(dtype='float64')
+        color_idx = self._color_index(distance_km)
+        
+        # Merge same-coloured points that would overlap at the initial zoom;
+        # default cell is one marker diameter in degrees
+        cell_deg = self.config.get('visualization', {}).get(
+            'point_bin_deg',
+            2 * self.MARKER_RADIUS * pixel_size_deg(zoom)
+        )
+        counts = np.ones(len(lonlat), dtype=np.int64)
+        if cell_deg and len(lonlat):
+            lonlat, distance_km, color_idx, counts = self._bin_points(
+                lonlat, distance_km, color_idx, cell_deg
+            )
+            self.logger.info(
+                f"Rendering {len(lonlat)} cells for {len(accessibility_wgs84)} points"
+            )
+        
+        radius = np.minimum(self.MARKER_RADIUS * np.sqrt(counts), self.MAX_MARKER_RADIUS)
+        lonlat = np.round(lonlat, COORD_DECIMALS)
+        
+        # One layer whose markers are created client-side from a single array;
+        # popup text is formatted in the browser from [.., distance, count]
+        CircleMarkerLayer(
+            [
+                [lat, lon, color, r, d, n]
+                for (lon, lat), color, r, d, n in zip(
+                    lonlat.tolist(),
+                    self.DISTANCE_COLORS[color_idx].tolist(),
+                    radius.tolist(),
+                    np.round(distance_km, 2).tolist(),
+                    counts.tolist()
+                )
+            ],
+            popup=DISTANCE_POPUP
+        ).add_to(m)
         
-        output_path = self.output_dir / "accessibility_map.html"
-        m.save(str(output_path))
+        output_path = self._save_map(m, "accessibility_map.html")
         self.logger.info(f"Accessibility map saved to {output_path}")
-        return str(output_path)
\ No newline at end of file
+        return str(output_path)
+    
+    def _color_index(self, distance_km: np.ndarray) -> np.ndarray:
+        """Index into DISTANCE_COLORS for every distance"""
+        if len(distance_km) >= self.NUMBA_MIN_POINTS and importlib.util.find_spec('numba'):
+            # Imported here so numba's start-up cost is only paid when used
+            from src.visualization._kernels import color_bins
+            
+            color_idx = np.empty(len(distance_km), dtype=np.int64)
+            color_bins(np.ascontiguousarray(distance_km), self.DISTANCE_EDGES, color_idx)
+            return color_idx
+        # side='right' keeps the bins [lower, upper); NaN sorts past every edge
+        return np.searchsorted(self.DISTANCE_EDGES, distance_km, side='right')
+    
+    @staticmethod
+    def _bin_points(
+        lonlat: np.ndarray,
+        distance_km: np.ndarray,
+        color_idx: np.ndarray,
+        cell_deg: float
+    ) -> tuple:
+        """
+        Aggregate points into (grid cell, colour) groups
+        
+        Returns the mean position, mean finite distance (NaN if none),
+        colour index and point count of every group.
+        """
+        cells = np.floor(lonlat / cell_deg).astype(np.int64)
+        keys = np.column_stack([cells, color_idx])
+        groups, inverse, counts = np.unique(
+            keys, axis=0, return_inverse=True, return_counts=True
+        )
+        inverse = inverse.ravel()
+        
+        lon = np.bincount(inverse, weights=lonlat[:, 0]) / counts
+        lat = np.bincount(inverse, weights=lonlat[:, 1]) / counts
+        finite = np.isfinite(distance_km)
+        total = np.bincount(inverse, weights=np.where(finite, distance_km, 0.0))
+        n_finite = np.bincount(inverse, weights=finite)
+        mean_km = np.divide(
+            total, n_finite, out=np.full(len(groups), np.nan), where=n_finite > 0
+        )
+        return np.column_stack([lon, lat]), mean_km, groups[:, 2], counts
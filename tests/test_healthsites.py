@@ -0,0 +1,73 @@
+import io
+import json
+
+import pytest
+
+from src.downloader.base import BaseDownloader
+from src.downloader.healthsites import HealthsitesDownloader
+
+GEOJSON = json.dumps({
+    'type': 'FeatureCollection',
+    'features': [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [36.8, -1.3]}, 'properties': {}},
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [37.0, -1.1]}, 'properties': {}},
+    ],
+}).encode()
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, content_type: str):
+        self.raw = io.BytesIO(body)
+        self.headers = {'Content-Type': content_type}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, response: FakeResponse):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    return HealthsitesDownloader(str(tmp_path))
+
+
+def _serve(monkeypatch, body: bytes, content_type: str = 'application/json'):
+    monkeypatch.setattr(BaseDownloader, '_session', FakeSession(FakeResponse(body, content_type)))
+
+
+def test_download_writes_geojson(downloader, monkeypatch):
+    _serve(monkeypatch, GEOJSON)
+
+    path = downloader.download()
+
+    with open(path) as f:
+        assert len(json.load(f)['features']) == 2
+    assert not list(downloader.output_dir.glob('*.part'))
+
+
+@pytest.mark.parametrize('body, content_type', [
+    (b'<html><body>Bad gateway</body></html>', 'text/html'),
+    (GEOJSON[:-20], 'application/json'),
+])
+def test_bad_body_keeps_previous_download(downloader, monkeypatch, body, content_type):
+    output_path = downloader.output_dir / 'facilities.geojson'
+    output_path.write_bytes(GEOJSON)
+    _serve(monkeypatch, body, content_type)
+
+    with pytest.raises(Exception):
+        downloader.download()
+
+    assert output_path.read_bytes() == GEOJSON
+    assert not list(downloader.output_dir.glob('*.part'))
@@ -0,0 +1,103 @@
+import os
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from rasterstats import zonal_stats
+from shapely.geometry import Point
+
+from src.config import Config
+from src.processor.raster import RasterProcessor
+
+UTM = 'EPSG:32737'
+
+
+@pytest.fixture
+def population_raster(tmp_path):
+    """300x300 grid of 100 m cells in UTM 37S with uneven values"""
+    path = tmp_path / 'population.tif'
+    data = np.random.default_rng(0).uniform(0, 50, (300, 300)).astype('float32')
+    with rasterio.open(
+        path,
+        'w',
+        driver='GTiff',
+        height=300,
+        width=300,
+        count=1,
+        dtype='float32',
+        crs=UTM,
+        transform=from_origin(480000, 9900000, 100, 100),
+        nodata=-200
+    ) as dst:
+        dst.write(data, 1)
+    return path
+
+
+@pytest.fixture
+def processor(tmp_path):
+    processor = RasterProcessor(Config(str(tmp_path / 'missing.yaml')))
+    yield processor
+    processor.close_all()
+
+
+def test_population_within_distance_matches_geoseries_buffer(population_raster, processor):
+    facilities = gpd.GeoDataFrame(
+        {'name': ['a', 'b']},
+        geometry=[Point(490000, 9890000), Point(500030, 9880070)],
+        crs=UTM
+    )
+    expected = [
+        s['sum'] for s in zonal_stats(
+            list(facilities.geometry.buffer(2000)),
+            str(population_raster),
+            stats=['sum'],
+            nodata=-200
+        )
+    ]
+
+    result = processor.calculate_population_within_distance(
+        str(population_raster), facilities, 2
+    )
+
+    np.testing.assert_allclose(result['population_within_2km'], expected)
+
+
+def test_population_within_distance_from_wgs84_keeps_attributes(population_raster, processor):
+    facilities = gpd.GeoDataFrame(
+        {'name': ['a', 'b', 'c']},
+        geometry=gpd.points_from_xy([38.90, 38.95, 38.92], [-0.95, -1.02, -0.99]),
+        crs='EPSG:4326',
+        index=[10, 5, 7]
+    )
+    expected = [
+        s['sum'] for s in zonal_stats(
+            list(facilities.to_crs(UTM).buffer(1500)),
+            str(population_raster),
+            stats=['sum'],
+            nodata=-200
+        )
+    ]
+
+    result = processor.calculate_population_within_distance(
+        str(population_raster), facilities, 1.5
+    )
+
+    assert result.crs == 'EPSG:4326'
+    assert list(result.index) == [10, 5, 7]
+    assert list(result['name']) == ['a', 'b', 'c']
+    np.testing.assert_allclose(result['population_within_1.5km'], expected)
+
+
+def test_raster_rewritten_in_place_is_reopened(population_raster, processor):
+    first = processor.load_raster(str(population_raster))[0]
+
+    with rasterio.open(population_raster, 'r+') as dst:
+        dst.write(np.ones((300, 300), dtype='float32'), 1)
+    stat = population_raster.stat()
+    os.utime(population_raster, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    second = processor.load_raster(str(population_raster))[0]
+    assert not np.array_equal(first, second)
+    assert (second == 1).all()
@@ -0,0 +1,48 @@
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from src.analysis.statistics import StatisticsAnalyzer
+from src.config import Config
+
+STATS = {
+    'total_facilities': 1,
+    'distance_statistics': {'mean_km': 2.5, 'std_km': np.nan},
+    'accessibility_by_threshold': {'5km': {'count': 1, 'percentage': 100.0}},
+}
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    return StatisticsAnalyzer(Config(str(tmp_path / 'missing.yaml')))
+
+
+def _strict_load(path):
+    def reject(token):
+        raise ValueError(f"invalid JSON constant {token}")
+    with open(path) as f:
+        return json.load(f, parse_constant=reject)
+
+
+def test_save_stats_without_orjson_writes_valid_json(analyzer, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    output_path = tmp_path / 'stats.json'
+
+    analyzer.save_stats(STATS, str(output_path))
+
+    saved = _strict_load(output_path)
+    assert saved['distance_statistics'] == {'mean_km': 2.5, 'std_km': None}
+    assert saved['accessibility_by_threshold'] == STATS['accessibility_by_threshold']
+
+
+def test_save_stats_matches_between_serializers(analyzer, tmp_path, monkeypatch):
+    pytest.importorskip('orjson')
+    with_orjson = tmp_path / 'orjson.json'
+    analyzer.save_stats(STATS, str(with_orjson))
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    with_json = tmp_path / 'json.json'
+    analyzer.save_stats(STATS, str(with_json))
+
+    assert _strict_load(with_orjson) == _strict_load(with_json)
@@ -0,0 +1,42 @@
+import os
+
+import geopandas as gpd
+import pytest
+from shapely.geometry import box
+
+from src.processor.vector import read_vector_cached
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def wards(tmp_path):
+    path = tmp_path / 'wards.shp'
+    gpd.GeoDataFrame(
+        {'name': ['a', 'b']},
+        geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1)],
+        crs='EPSG:4326'
+    ).to_file(path)
+    return path
+
+
+def test_snapshot_is_written_atomically(wards):
+    gdf = read_vector_cached(str(wards))
+
+    snapshot = wards.with_suffix('.parquet')
+    assert snapshot.exists()
+    assert not list(wards.parent.glob('.*.tmp'))
+    assert gpd.read_parquet(snapshot).equals(gdf)
+
+
+def test_truncated_snapshot_falls_back_to_source(wards):
+    snapshot = wards.with_suffix('.parquet')
+    snapshot.write_bytes(b'PAR1\x00\x00')
+    newer = wards.stat().st_mtime + 10
+    os.utime(snapshot, (newer, newer))
+
+    gdf = read_vector_cached(str(wards))
+
+    assert list(gdf['name']) == ['a', 'b']
+    # The bad snapshot is replaced by a readable one
+    assert gpd.read_parquet(snapshot).equals(gdf)
@@ -0,0 +1,71 @@
+import gzip
+
+import folium
+import pytest
+
+from src.config import Config
+from src.visualization.base import BaseVisualizer
+
+
+class MapVisualizer(BaseVisualizer):
+    def generate(self):
+        return self._save_map(small_map(), 'map.html')
+
+
+def small_map() -> folium.Map:
+    m = folium.Map(location=[-1.3, 36.8], zoom_start=8)
+    folium.Marker([-1.3, 36.8], popup='Facility').add_to(m)
+    return m
+
+
+class RenderOnlyTemplate:
+    """Template without stream(), as a branca release could ship"""
+
+    def __init__(self, template):
+        self.template = template
+
+    def render(self, **kwargs):
+        return self.template.render(**kwargs)
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(str(tmp_path / 'missing.yaml'))
+
+
+def _check_page(html, m):
+    assert html.lstrip().startswith('<!DOCTYPE html>')
+    assert 'leaflet' in html
+    assert f'var {m.get_name()} = L.map(' in html
+    assert 'Facility' in html
+    assert html.rstrip().endswith('</html>')
+
+
+def test_save_map_streams_html(config, tmp_path):
+    m = small_map()
+
+    path = MapVisualizer(config, str(tmp_path))._save_map(m, 'map.html')
+
+    assert path == tmp_path / 'map.html'
+    _check_page(path.read_text(encoding='utf-8'), m)
+
+
+def test_save_map_gzip(config, tmp_path):
+    config.config['visualization'] = {'gzip_html': True}
+    m = small_map()
+
+    path = MapVisualizer(config, str(tmp_path))._save_map(m, 'map.html')
+
+    assert path == tmp_path / 'map.html.gz'
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        _check_page(f.read(), m)
+
+
+def test_save_map_without_template_stream(config, tmp_path):
+    m = small_map()
+    root = m.get_root()
+    root._template = RenderOnlyTemplate(root._template)
+
+    path = MapVisualizer(config, str(tmp_path))._save_map(m, 'map.html')
+
+    _check_page(path.read_text(encoding='utf-8'), m)